@@ -0,0 +1,63 @@
+import importlib
+from math import inf
+
+import pytest
+import tictactoe_kernel
+from tictactoe_kernel import (
+    SYMMETRIES,
+    WINS,
+    minmax,
+    opening_move,
+    player_bb,
+    result_bb,
+    transform_bb,
+    value,
+)
+
+# Every position the opening book covers: the empty board, and X on any cell
+BOOK_POSITIONS = [(0, 0)] + [(1 << cell, 0) for cell in range(9)]
+
+
+def test_symmetries_are_permutations():
+    for symmetry in SYMMETRIES:
+        assert sorted(symmetry) == list(range(9))
+
+    assert len(set(SYMMETRIES)) == 8
+
+
+def test_symmetries_preserve_winning_lines():
+    for symmetry in SYMMETRIES:
+        assert {transform_bb(line, symmetry) for line in WINS} == set(WINS)
+
+
+@pytest.mark.parametrize("state", BOOK_POSITIONS)
+def test_opening_move_matches_full_search(state):
+    x, o = state
+    move = opening_move(x, o)
+    assert move is not None
+    assert not (x | o) >> move & 1
+
+    is_max_player = player_bb(x, o) == "X"
+    best, _ = minmax(state, is_max_player, -inf, inf)
+    assert value(*result_bb(x, o, move), not is_max_player) == best
+
+
+def test_opening_move_off_book():
+    assert opening_move(1 << 4, 1 << 0) is None
+
+
+# Positions with several equally good moves, where the move returned
+# depends on the order the search tries them in
+TIED_POSITIONS = [(0b000000011, 0b000001000), (0b000000101, 0b000001000)]
+
+
+@pytest.mark.parametrize("state", TIED_POSITIONS)
+def test_minmax_does_not_depend_on_earlier_searches(state):
+    kernel = importlib.reload(tictactoe_kernel)
+    is_max_player = kernel.player_bb(*state) == "X"
+    fresh = kernel.minmax(state, is_max_player, -inf, inf)
+
+    for x, o in BOOK_POSITIONS + TIED_POSITIONS:
+        kernel.minmax((x, o), kernel.player_bb(x, o) == "X", -inf, inf)
+
+    assert kernel.minmax(state, is_max_player, -inf, inf) == fresh
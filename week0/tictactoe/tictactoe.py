@@ -3,11 +3,9 @@ Tic Tac Toe Player
 """
 
 from math import inf
-import pytest
-from copy import deepcopy
 
-X = "X"
-O = "O"
+from tictactoe_kernel import O, X, minmax, opening_move, winner_bb
+
 EMPTY = None
 
 
@@ -18,40 +16,61 @@ def initial_state():
     return [[EMPTY, EMPTY, EMPTY], [EMPTY, EMPTY, EMPTY], [EMPTY, EMPTY, EMPTY]]
 
 
+def _analyze(board):
+    """
+    Scans the board once and returns (x, o, empties, winner), where `x` and
+    `o` are the bitboards of each player's cells and `empties` is the list
+    of (i, j) cells that are still EMPTY.
+    """
+    x = o = 0
+    empties = []
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell is EMPTY:
+                empties.append((i, j))
+            elif cell == X:
+                x |= 1 << (3 * i + j)
+            else:
+                o |= 1 << (3 * i + j)
+
+    return x, o, empties, winner_bb(x, o)
+
+
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    if sum(row.count(X) for row in board) == sum(row.count(O) for row in board):
-        return X
-    else:
-        return O
+    x_count = o_count = 0
+    for row in board:
+        for cell in row:
+            if cell == X:
+                x_count += 1
+            elif cell == O:
+                o_count += 1
+
+    return X if x_count == o_count else O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    return set(
-        [
-            (i, j)
-            for (i, row) in enumerate(board)
-            for (j, item) in enumerate(row)
-            if item is EMPTY
-        ]
-    )
+    _, _, empties, _ = _analyze(board)
+
+    return set(empties)
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    if action not in actions(board):
+    x, o, empties, _ = _analyze(board)
+    if action not in empties:
         raise ValueError(f"Invalid action: {action}")
 
     row, col = action
-    new_board = deepcopy(board)
-    new_board[row][col] = player(board)
+    new_board = [row[:] for row in board]
+    new_board[row][col] = X if x.bit_count() == o.bit_count() else O
 
     return new_board
 
@@ -60,18 +79,21 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
+    r0, r1, r2 = board
+
     for row in board:
-        if row[0] == row[1] == row[2] != EMPTY:
-            return row[0]
+        v = row[0]
+        if v is not EMPTY and v == row[1] == row[2]:
+            return v
 
-    for col in range(3):
-        if board[0][col] == board[1][col] == board[2][col] != EMPTY:
-            return board[0][col]
+    for col in (0, 1, 2):
+        v = r0[col]
+        if v is not EMPTY and v == r1[col] == r2[col]:
+            return v
 
-    if board[0][0] == board[1][1] == board[2][2] != EMPTY:
-        return board[0][0]
-    elif board[0][2] == board[1][1] == board[2][0] != EMPTY:
-        return board[0][2]
+    v = r1[1]
+    if v is not EMPTY and (v == r0[0] == r2[2] or v == r0[2] == r2[0]):
+        return v
 
     return None
 
@@ -80,16 +102,18 @@ def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    all_filled = len([col for row in board for col in row if col is EMPTY]) == 0
+    _, _, empties, win = _analyze(board)
 
-    return True if all_filled or winner(board) is not None else False
+    return not empties or win is not None
 
 
 def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    match winner(board):
+    _, _, _, win = _analyze(board)
+
+    match win:
         case "X":
             return 1
         case "O":
@@ -100,61 +124,16 @@ def utility(board):
     return None
 
 
-def minmax(state, is_max_player, alpha, beta):
-    move = None
-
-    if terminal(state):
-        return utility(state), move
-
-    if is_max_player:
-        v = -inf
-
-        for action in actions(state):
-            new_v, _ = minmax(result(state, action), False, alpha, beta)
-            if new_v > v:
-                v = new_v
-                move = action
-
-            alpha = max(v, alpha)
-
-            # prune
-            if beta <= alpha:
-                break
-
-        return v, move
-
-    else:
-        v = inf
-
-        for action in actions(state):
-            new_v, _ = minmax(result(state, action), True, alpha, beta)
-            if new_v < v:
-                v = new_v
-                move = action
-
-            beta = min(v, beta)
-
-            # prune
-            if beta <= alpha:
-                break
-
-        return v, move
-
-
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
-    if terminal(board):
+    x, o, empties, win = _analyze(board)
+    if not empties or win is not None:
         return None
 
-    current_player = player(board)
+    move = opening_move(x, o)
+    if move is None:
+        _, move = minmax((x, o), x.bit_count() == o.bit_count(), -inf, inf)
 
-    match current_player:
-        case "X":
-            if all([row.count(EMPTY) == 3 for row in board]):
-                return (1, 1)
-
-            return minmax(board, True, -inf, inf)[1]
-        case "O":
-            return minmax(board, False, -inf, inf)[1]
+    return divmod(move, 3)
@@ -0,0 +1,225 @@
+"""
+Tic Tac Toe search kernel
+
+Everything here works on integer state only: a position is a pair of
+9-bit masks (x, o), so these functions never touch the nested-list board.
+"""
+
+from functools import lru_cache
+from math import inf
+
+X = "X"
+O = "O"
+
+# Bitboard representation used by the search: bit 3 * i + j of `x` (`o`)
+# is set when X (O) occupies cell (i, j).
+FULL = 0x1FF
+WINS = (0o007, 0o070, 0o700, 0o111, 0o222, 0o444, 0o421, 0o124)
+
+# Cells in the order the search tries them: center, corners, then edges.
+# Strong moves first lets alpha-beta cut off more of the tree.
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+
+def player_bb(x, o):
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def winner_bb(x, o):
+    for w in WINS:
+        if x & w == w:
+            return X
+        if o & w == w:
+            return O
+
+    return None
+
+
+def terminal_bb(x, o):
+    return (x | o) == FULL or winner_bb(x, o) is not None
+
+
+def utility_bb(x, o):
+    match winner_bb(x, o):
+        case "X":
+            return 1
+        case "O":
+            return -1
+        case None:
+            return 0
+
+
+def actions_bb(x, o):
+    taken = x | o
+    return tuple(cell for cell in MOVE_ORDER if not taken >> cell & 1)
+
+
+def result_bb(x, o, cell):
+    if player_bb(x, o) == X:
+        return x | 1 << cell, o
+
+    return x, o | 1 << cell
+
+
+# The 8 symmetries of the board (rotations and reflections), each given
+# as the cell that every cell 0..8 is mapped to.
+SYMMETRIES = tuple(
+    tuple(3 * f(i, j)[0] + f(i, j)[1] for i in range(3) for j in range(3))
+    for f in (
+        lambda i, j: (i, j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i),
+    )
+)
+
+# Optimal replies for every position with at most one stone, keyed by
+# canonical form: empty board, X in the center, X in a corner, X on an edge.
+OPENING = {
+    (0, 0): 4,
+    (1 << 4, 0): 0,
+    (1 << 0, 0): 4,
+    (1 << 1, 0): 4,
+}
+
+
+def transform_bb(mask, symmetry):
+    out = 0
+    for cell, image in enumerate(symmetry):
+        if mask >> cell & 1:
+            out |= 1 << image
+
+    return out
+
+
+def canonical_bb(x, o):
+    """
+    Returns the smallest (x, o) among the position's 8 symmetric images,
+    together with the symmetry that produces it.
+    """
+    return min(
+        ((transform_bb(x, sym), transform_bb(o, sym)), sym) for sym in SYMMETRIES
+    )
+
+
+def opening_move(x, o):
+    """
+    Returns the book move for the position, or None if it is not in the book.
+    """
+    if (x | o).bit_count() > 1:
+        return None
+
+    state, symmetry = canonical_bb(x, o)
+    move = OPENING.get(state)
+
+    return None if move is None else symmetry.index(move)
+
+
+def new_killers():
+    """
+    Returns an empty killer table: for each ply (number of stones on the
+    board), the last move that ended a search early. Sibling positions try
+    it first. Each top-level search gets its own table, so the moves it
+    tries first never depend on earlier searches.
+    """
+    return [None] * 9
+
+
+def ordered_actions(x, o, killers):
+    """
+    Returns the moves of the position with this ply's killer move first.
+    """
+    moves = actions_bb(x, o)
+    killer = killers[(x | o).bit_count()]
+
+    if killer in moves:
+        return (killer,) + tuple(move for move in moves if move != killer)
+
+    return moves
+
+
+def search(x, o, is_max_player, killers, table):
+    """
+    Returns the exact minimax value of the position, recording cutoffs in
+    `killers`. Results are stored in `table`, so positions reached through
+    different move orders are searched once.
+    """
+    key = (x, o, is_max_player)
+    if key in table:
+        return table[key]
+
+    if terminal_bb(x, o):
+        table[key] = utility_bb(x, o)
+        return table[key]
+
+    # A forced win is the best any move can do, so stop there; the value
+    # stays exact, which keeps it safe to store.
+    best_possible = 1 if is_max_player else -1
+    best = -best_possible
+
+    for action in ordered_actions(x, o, killers):
+        v = search(*result_bb(x, o, action), not is_max_player, killers, table)
+        best = max(best, v) if is_max_player else min(best, v)
+
+        if best == best_possible:
+            killers[(x | o).bit_count()] = action
+            break
+
+    table[key] = best
+    return best
+
+
+@lru_cache(maxsize=None)
+def value(x, o, is_max_player):
+    """
+    Returns the exact minimax value of the position.
+    """
+    return search(x, o, is_max_player, new_killers(), {})
+
+
+def minmax(state, is_max_player, alpha, beta):
+    move = None
+
+    if terminal_bb(*state):
+        return utility_bb(*state), move
+
+    killers = new_killers()
+    table = {}
+
+    if is_max_player:
+        v = -inf
+
+        for action in ordered_actions(*state, killers):
+            new_v = search(*result_bb(*state, action), False, killers, table)
+            if new_v > v:
+                v = new_v
+                move = action
+
+            alpha = max(v, alpha)
+
+            # prune
+            if beta <= alpha:
+                break
+
+        return v, move
+
+    else:
+        v = inf
+
+        for action in ordered_actions(*state, killers):
+            new_v = search(*result_bb(*state, action), True, killers, table)
+            if new_v < v:
+                v = new_v
+                move = action
+
+            beta = min(v, beta)
+
+            # prune
+            if beta <= alpha:
+                break
+
+        return v, move
@@ -1,5 +1,37 @@
 import random
-from typing import Any, List, Set, Tuple, Union
+from collections import defaultdict
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, List, Set, Tuple, Union
+
+import numpy as np
+
+DIRECTIONS = [
+    (0, -1),
+    (1, -1),
+    (1, 0),
+    (1, 1),
+    (0, 1),
+    (-1, 1),
+    (-1, 0),
+    (-1, -1),
+]
+
+
+def neighbour_table(
+    height: int, width: int
+) -> Dict[Tuple[int, int], FrozenSet[Tuple[int, int]]]:
+    """
+    Returns a mapping from every cell on a `height` x `width` board
+    to the set of in-bounds cells adjacent to it.
+    """
+    return {
+        (y, x): frozenset(
+            (y + dy, x + dx)
+            for dx, dy in DIRECTIONS
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        )
+        for y in range(height)
+        for x in range(width)
+    }
 
 
 class Minesweeper:
@@ -11,23 +43,14 @@ class Minesweeper:
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines: Set[Tuple[int, int]] = set()
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        self.board = np.zeros((height, width), dtype=np.bool_)
 
         # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        positions = random.sample(range(height * width), mines)
+        self.mines: Set[Tuple[int, int]] = {divmod(p, width) for p in positions}
+        self.board.flat[positions] = True
 
         # At first, player has found no mines
         self.mines_found: Set[Tuple[int, int]] = set()
@@ -40,16 +63,16 @@ class Minesweeper:
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.board[i, j]:
                     print("|X", end="")
                 else:
                     print("| ", end="")
             print("|")
         print("--" * self.width + "-")
 
-    def is_mine(self, cell: Tuple[int, int]) -> int:
+    def is_mine(self, cell: Tuple[int, int]) -> bool:
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell: Tuple[int, int]) -> int:
         """
@@ -58,22 +81,10 @@ class Minesweeper:
         not including the cell itself.
         """
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+        i, j = cell
+        window = self.board[max(0, i - 1) : i + 2, max(0, j - 1) : j + 2]
 
-        return count
+        return int(window.sum()) - int(self.board[i, j])
 
     def won(self) -> bool:
         """
@@ -89,33 +100,36 @@ class Sentence:
     and a count of the number of those cells which are mines.
     """
 
-    def __init__(self, cells: Set[Tuple[int, int]], count: int) -> None:
-        self.cells = set(cells)
+    def __init__(self, cells: AbstractSet[Tuple[int, int]], count: int) -> None:
+        self.cells = frozenset(cells)
         self.count = count
 
     def __eq__(self, other: Any) -> bool:
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self) -> int:
+        return hash((self.cells, self.count))
+
     def __str__(self) -> str:
         return f"{self.cells} = {self.count}"
 
-    def known_mines(self) -> Set[Tuple[int, int]]:
+    def known_mines(self) -> FrozenSet[Tuple[int, int]]:
         """
         Returns the set of all cells in self.cells known to be mines.
 
         More generally, any time the number of cells is equal to the count,
         we know that all of that sentence’s cells must be mines.
         """
-        return self.cells if self.count == len(self.cells) else set()
+        return self.cells if self.count == len(self.cells) else frozenset()
 
-    def known_safes(self) -> Set[Tuple[int, int]]:
+    def known_safes(self) -> FrozenSet[Tuple[int, int]]:
         """
         Returns the set of all cells in self.cells known to be safe.
 
         Any time we have a sentence whose count is 0,
         we know that all of that sentence’s cells must be safe.
         """
-        return self.cells if self.count == 0 else set()
+        return self.cells if self.count == 0 else frozenset()
 
     def mark_mine(self, cell: Tuple[int, int]) -> None:
         """
@@ -127,7 +141,7 @@ class Sentence:
         that contributed to that count)
         """
         if cell in self.cells:
-            self.cells.remove(cell)
+            self.cells = self.cells - {cell}
             if self.count > 0:
                 self.count -= 1
 
@@ -140,7 +154,7 @@ class Sentence:
         we could remove C from the sentence altogether
         """
         if cell in self.cells:
-            self.cells.remove(cell)
+            self.cells = self.cells - {cell}
 
 
 class MinesweeperAI:
@@ -160,8 +174,22 @@ class MinesweeperAI:
         self.mines: Set[Tuple[int, int]] = set()
         self.safes: Set[Tuple[int, int]] = set()
 
-        # List of sentences about the game known to be true
+        # Safe cells that have not been played yet; kept equal to
+        # safes - moves_made
+        self._safe_frontier: Set[Tuple[int, int]] = set()
+
+        # Cells that are played, safe or mines and so never enter a new
+        # sentence; kept equal to moves_made | safes | mines
+        self._excluded: Set[Tuple[int, int]] = set()
+
+        # List of sentences about the game known to be true, with no
+        # empty or duplicate sentences; `_kb_keys` holds the
+        # (cells, count) of every sentence in it
         self.knowledge: List[Sentence] = []
+        self._kb_keys: Set[Tuple[FrozenSet[Tuple[int, int]], int]] = set()
+
+        # Neighbours of every cell, computed once per board size
+        self._neighbours = neighbour_table(height, width)
 
     def mark_mine(self, cell: Tuple[int, int]) -> None:
         """
@@ -169,8 +197,8 @@ class MinesweeperAI:
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self._excluded.add(cell)
+        self._mark_knowledge(cell, Sentence.mark_mine)
 
     def mark_safe(self, cell: Tuple[int, int]) -> None:
         """
@@ -178,45 +206,46 @@ class MinesweeperAI:
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
+        self._excluded.add(cell)
+        if cell not in self.moves_made:
+            self._safe_frontier.add(cell)
+        self._mark_knowledge(cell, Sentence.mark_safe)
+
+    def _mark_knowledge(
+        self,
+        cell: Tuple[int, int],
+        mark: Callable[[Sentence, Tuple[int, int]], None],
+    ) -> None:
+        """
+        Applies `mark` to every sentence mentioning `cell`, dropping
+        sentences that end up empty or equal to another sentence.
+        """
+        knowledge = []
         for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+            if cell in sentence.cells:
+                self._kb_keys.discard((sentence.cells, sentence.count))
+                mark(sentence, cell)
 
-    def neighbours(self, cell: Tuple[int, int]) -> Set[Tuple[int, int]]:
-        y, x = cell
-        neighbors = set()
-
-        directions = [
-            (0, -1),
-            (1, -1),
-            (1, 0),
-            (1, 1),
-            (0, 1),
-            (-1, 1),
-            (-1, 0),
-            (-1, -1),
-        ]
-
-        for dx, dy in directions:
-            row, col = dy + y, dx + x
-
-            if 0 <= col < self.width and 0 <= row < self.height:
-                neighbors.add((row, col))
+                key = (sentence.cells, sentence.count)
+                if not sentence.cells or key in self._kb_keys:
+                    continue
+                self._kb_keys.add(key)
 
-        return neighbors
+            knowledge.append(sentence)
 
-    def cleanup(self):
-        seen = set()
-        result = []
+        self.knowledge = knowledge
 
-        for s in sorted(
-            [s for s in self.knowledge if len(s.cells)], key=lambda s: len(s.cells)
-        ):
-            key = (frozenset(s.cells), s.count)
-            if key not in seen:
-                seen.add(key)
-                result.append(s)
+    def _add_sentence(self, sentence: Sentence) -> None:
+        """
+        Adds `sentence` to the knowledge unless it is empty or known already.
+        """
+        key = (sentence.cells, sentence.count)
+        if sentence.cells and key not in self._kb_keys:
+            self._kb_keys.add(key)
+            self.knowledge.append(sentence)
 
-        return result
+    def neighbours(self, cell: Tuple[int, int]) -> FrozenSet[Tuple[int, int]]:
+        return self._neighbours[cell]
 
     def infer_subsets(self) -> List[Sentence]:
         """
@@ -225,43 +254,46 @@ class MinesweeperAI:
         if there is such a sentence, then add a new sentence to kb, where:
         {B - A}: countB - countA
         """
-        kb = self.cleanup()
-        seen = {frozenset(x.cells) for x in kb}
-
-        def generator():
-            for s1 in kb:
-                for s2 in kb:
-                    if not len(s1.cells) or not len(s2.cells):
-                        continue
+        kb = self.knowledge
+        seen = {x.cells for x in kb}
 
-                    if s1.cells.issubset(s2.cells):
-                        new_cells = s2.cells - s1.cells
+        # Index sentences by the cells they contain: the sentences that
+        # contain every cell of A are exactly the supersets of A
+        by_cell = defaultdict(set)
+        for i, s in enumerate(kb):
+            for cell in s.cells:
+                by_cell[cell].add(i)
 
-                        if new_cells and frozenset(new_cells) not in seen:
-                            yield Sentence(new_cells, s2.count - s1.count)
+        def generator():
+            for i, s1 in enumerate(kb):
+                supersets = set.intersection(*(by_cell[c] for c in s1.cells))
 
-                    if s2.cells.issubset(s1.cells):
-                        new_cells = s1.cells - s2.cells
+                for j in supersets - {i}:
+                    s2 = kb[j]
+                    new_cells = s2.cells - s1.cells
 
-                        if new_cells and frozenset(new_cells) not in seen:
-                            yield Sentence(new_cells, s1.count - s2.count)
+                    if new_cells and new_cells not in seen:
+                        yield Sentence(new_cells, s2.count - s1.count)
 
         return list(generator())
 
     def conclusion_loop(self):
-        while True:
-            self.knowledge = self.cleanup()
+        changed = True
+        while changed:
+            changed = False
 
-            safes = {x for s in self.knowledge for x in s.known_safes()}
-            for s in safes:
-                self.mark_safe(s)
+            for s in self.knowledge:
+                if not s.cells:
+                    continue
 
-            mines = {x for s in self.knowledge for x in s.known_mines()}
-            for s in mines:
-                self.mark_mine(s)
-
-            if not len(safes) and not len(mines):
-                break
+                if s.count == 0:
+                    for cell in s.cells:
+                        self.mark_safe(cell)
+                    changed = True
+                elif s.count == len(s.cells):
+                    for cell in s.cells:
+                        self.mark_mine(cell)
+                    changed = True
 
     def inference_loop(self):
         while True:
@@ -271,7 +303,8 @@ class MinesweeperAI:
             if not len(inference):
                 break
 
-            self.knowledge.extend(inference)
+            for sentence in inference:
+                self._add_sentence(sentence)
 
     def add_knowledge(self, cell: Tuple[int, int], count: int) -> None:
         """
@@ -289,25 +322,15 @@ class MinesweeperAI:
                if they can be inferred from existing knowledge
         """
         self.moves_made.add(cell)
+        self._excluded.add(cell)
+        self._safe_frontier.discard(cell)
 
         self.mark_safe(cell)
 
         neighbours = self.neighbours(cell)
         if neighbours:
-            mines = len([x for x in neighbours if x in self.mines])
-            sentence = Sentence(
-                {
-                    x
-                    for x in neighbours
-                    if x not in self.moves_made
-                    and x not in self.safes
-                    and x not in self.mines
-                },
-                count - mines,
-            )
-
-            if len(sentence.cells):
-                self.knowledge.append(sentence)
+            mines = len(neighbours & self.mines)
+            self._add_sentence(Sentence(neighbours - self._excluded, count - mines))
 
         self.inference_loop()
 
@@ -320,11 +343,7 @@ class MinesweeperAI:
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        for x in self.safes:
-            if x not in self.moves_made:
-                return x
-
-        return None
+        return next(iter(self._safe_frontier), None)
 
     def make_random_move(self) -> Union[None, Tuple[int, int]]:
         """
@@ -1,4 +1,4 @@
-from copy import deepcopy
+from collections import defaultdict
 
 from minesweeper import Sentence
 
@@ -10,35 +10,39 @@ def infer_subsets(kb) -> list[Sentence]:
     if there is such a sentence, then add a new sentence to kb, where:
     {B - A}: countB - countA
     """
-    seen = {frozenset(x.cells) for x in kb}
+    seen = {x.cells for x in kb}
+
+    by_cell = defaultdict(set)
+    for i, s in enumerate(kb):
+        for cell in s.cells:
+            by_cell[cell].add(i)
 
     def generator():
         for i, s1 in enumerate(kb):
-            for s2 in kb[i + 1 :]:
-                if s1.cells.issubset(s2.cells):
-                    new_cells = s2.cells - s1.cells
+            if not s1.cells:
+                continue
 
-                    if new_cells and frozenset(new_cells) not in seen:
-                        yield Sentence(new_cells, s2.count - s1.count)
+            supersets = set.intersection(*(by_cell[c] for c in s1.cells))
 
-                if s2.cells.issubset(s1.cells):
-                    new_cells = s1.cells - s2.cells
+            for j in supersets - {i}:
+                s2 = kb[j]
+                new_cells = s2.cells - s1.cells
 
-                    if new_cells and frozenset(new_cells) not in seen:
-                        yield Sentence(new_cells, s1.count - s2.count)
+                if new_cells and new_cells not in seen:
+                    yield Sentence(new_cells, s2.count - s1.count)
 
     return list(generator())
 
 
 def inference(kb):
-    result = deepcopy(kb)
+    result = list(kb)
     seen = set()
 
     while True:
         inference = [
             s
             for s in infer_subsets(kb)
-            if frozenset(s.cells) not in seen and not seen.add(frozenset(s.cells))
+            if s.cells not in seen and not seen.add(s.cells)
         ]
 
         length = len(result)
@@ -54,7 +58,7 @@ def inference(kb):
 
 
 def inf(kb):
-    cpy = deepcopy(kb)
+    cpy = list(kb)
 
     while True:
         prev = len(cpy)
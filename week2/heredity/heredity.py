@@ -1,10 +1,9 @@
 import csv
 import itertools
-import math
 import sys
 from typing import TypedDict
 
-import pandas as pd
+import numpy as np
 
 PROBS = {
     # Unconditional probabilities for having gene
@@ -21,6 +20,14 @@ PROBS = {
     "mutation": 0.01,
 }
 
+# PROBS["gene"] and PROBS["trait"] as arrays indexed by gene count
+# (and trait), for the vectorized joint probability
+GENE_PROBS = np.array([PROBS["gene"][g] for g in range(3)])
+TRAIT_PROBS = np.array(
+    [[PROBS["trait"][g][t] for t in (False, True)] for g in range(3)]
+)
+PASS_PROBS = np.array([PROBS["mutation"], 0.5, 1 - PROBS["mutation"]])
+
 
 def main():
     # Check for proper usage
@@ -34,26 +41,24 @@ def main():
         for person in people
     }
 
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (
-                people[person]["trait"] is not None
-                and people[person]["trait"] != (person in have_trait)
-            )
-            for person in names
-        )
-        if fails_evidence:
-            continue
-
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+    order = list(people)
+    mother, father = parent_indices(people, order)
+    gene_count, trait = assignments(people, order)
+    log_ps = log_joint_probabilities(gene_count, trait, mother, father)
+
+    # Joint probabilities of large families underflow; normalize only needs
+    # their relative sizes, so scale them by the largest one first
+    ps = np.exp(log_ps - log_ps.max())
+
+    # Update probabilities with every joint probability at once
+    gene_totals, trait_totals = totals(gene_count, trait, ps)
+    for k, person in enumerate(order):
+        genes = probabilities[person]["gene"]
+        traits = probabilities[person]["trait"]
+        for gene in genes:
+            genes[gene] = float(gene_totals[k, gene])
+        for has_trait in traits:
+            traits[has_trait] = float(trait_totals[k, int(has_trait)])
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
@@ -97,15 +102,12 @@ def load_data(filename):
 
 def powerset(s):
     """
-    Return a list of all possible subsets of set s.
+    Yield every subset of set s as a frozenset, smallest first.
     """
-    s = list(s)
-    return [
-        set(s)
-        for s in itertools.chain.from_iterable(
-            itertools.combinations(s, r) for r in range(len(s) + 1)
-        )
-    ]
+    s = tuple(s)
+    for r in range(len(s) + 1):
+        for subset in itertools.combinations(s, r):
+            yield frozenset(subset)
 
 
 type Name = str
@@ -118,24 +120,95 @@ class Person(TypedDict):
     trait: bool
 
 
-def inheritance_probability(row, df):
-    mother = df.loc[row["mother"]]
-    father = df.loc[row["father"]]
+def assignments(
+    people: dict[Name, Person], order: list[Name]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Enumerate every assignment of gene counts and traits to the people in
+    `order` that agrees with the known traits.
+
+    Return `(gene_count, trait)`: (K, P) arrays with one row per assignment
+    and one column per person, holding 0-2 gene copies and the trait bit.
+    """
+    n = len(order)
+
+    # Each assignment is one point of a (3, ..., 3, 2, ..., 2) grid: a gene
+    # count digit and a trait digit per person
+    codes = np.indices((3,) * n + (2,) * n, dtype=np.int8).reshape(2 * n, -1).T
+    gene_count, trait = codes[:, :n], codes[:, n:].astype(np.bool_)
 
-    def gene_pass_probability(parent):
-        count = parent["gene_count"]
-        return {0: PROBS["mutation"], 1: 0.5, 2: 1 - PROBS["mutation"]}[count]
+    # Drop assignments that contradict known traits
+    known = [k for k, name in enumerate(order) if people[name]["trait"] is not None]
+    evidence = [people[order[k]]["trait"] for k in known]
+    matches = (trait[:, known] == evidence).all(axis=1)
 
-    m = gene_pass_probability(mother)
-    f = gene_pass_probability(father)
+    return gene_count[matches], trait[matches]
+
+
+def parent_indices(
+    people: dict[Name, Person], order: list[Name]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return arrays holding the position in `order` of each person's mother
+    and father, or -1 for people without parents in the data.
+    """
+    index = {name: k for k, name in enumerate(order)}
+    mother = [index.get(people[name]["mother"], -1) for name in order]
+    father = [index.get(people[name]["father"], -1) for name in order]
 
-    match row["gene_count"]:
-        case 2:
-            return m * f
-        case 1:
-            return m * (1 - f) + (1 - m) * f
-        case _:
-            return (1 - m) * (1 - f)
+    return np.array(mother), np.array(father)
+
+
+def gene_counts(
+    order: list[Name], one_gene: set[Name], two_genes: set[Name]
+) -> list[int]:
+    """
+    Return the number of gene copies of each person in `order`.
+    """
+    return [1 if name in one_gene else 2 if name in two_genes else 0 for name in order]
+
+
+def log_joint_probabilities(
+    gene_count: np.ndarray,
+    trait: np.ndarray,
+    mother: np.ndarray,
+    father: np.ndarray,
+) -> np.ndarray:
+    """
+    Compute the log joint probability of many assignments at once.
+
+    `gene_count` and `trait` are (K, P) arrays with one row per assignment
+    and one column per person; `mother` and `father` hold each person's
+    parent columns as returned by `parent_indices`. Return the K log joint
+    probabilities, summed per person so that large families do not underflow.
+    """
+    # Probability that each person passes the gene on to a child
+    passes = PASS_PROBS[gene_count]
+    m = passes[:, mother]
+    f = passes[:, father]
+
+    inherited = np.where(
+        gene_count == 2,
+        m * f,
+        np.where(gene_count == 1, m * (1 - f) + (1 - m) * f, (1 - m) * (1 - f)),
+    )
+    gene_p = np.where(mother >= 0, inherited, GENE_PROBS[gene_count])
+    trait_p = TRAIT_PROBS[gene_count, trait.astype(np.int8)]
+
+    return np.log(gene_p * trait_p).sum(axis=1)
+
+
+def joint_probabilities(
+    gene_count: np.ndarray,
+    trait: np.ndarray,
+    mother: np.ndarray,
+    father: np.ndarray,
+) -> np.ndarray:
+    """
+    Compute the joint probability of many assignments at once; see
+    `log_joint_probabilities` for the arguments.
+    """
+    return np.exp(log_joint_probabilities(gene_count, trait, mother, father))
 
 
 def joint_probability(
@@ -157,23 +230,28 @@ def joint_probability(
         * everyone in set `have_trait` has the trait, and
         * everyone not in set` have_trait` does not have the trait.
     """
-    df = pd.DataFrame.from_dict(people, orient="index")
-    df["gene_count"] = df["name"].map(
-        lambda name: 1 if name in one_gene else 2 if name in two_genes else 0
-    )
-    df["has_trait"] = df["name"].map(lambda name: name in have_trait)
-    df["trait_probability"] = df.apply(
-        lambda row: PROBS["trait"][row["gene_count"]][row["has_trait"]], axis=1
-    )
-    df["gene_probability"] = df.apply(
-        lambda row: inheritance_probability(row, df)
-        if pd.notna(row["mother"])
-        else PROBS["gene"][row["gene_count"]],
-        axis=1,
-    )
-    df["joint_probability"] = df["gene_probability"] * df["trait_probability"]
+    order = list(people)
+    mother, father = parent_indices(people, order)
+    gene_count = np.array([gene_counts(order, one_gene, two_genes)], dtype=np.int8)
+    trait = np.array([[name in have_trait for name in order]], dtype=np.bool_)
+
+    return float(joint_probabilities(gene_count, trait, mother, father)[0])
+
+
+def totals(
+    gene_count: np.ndarray, trait: np.ndarray, ps: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sum the joint probabilities `ps` of the assignments in `gene_count` and
+    `trait` per person and value, as `update` would one assignment at a time.
+
+    Return (P, 3) gene totals indexed by gene count and (P, 2) trait totals
+    indexed by trait.
+    """
+    gene_totals = np.tensordot(ps, gene_count[..., None] == np.arange(3), axes=1)
+    trait_totals = np.stack([ps @ ~trait, ps @ trait], axis=1)
 
-    return math.prod(df["joint_probability"])
+    return gene_totals, trait_totals
 
 
 class Probability(TypedDict):
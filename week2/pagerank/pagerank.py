@@ -1,11 +1,15 @@
 import os
-import random
 import re
 import sys
 
+import numpy as np
+
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Compiled once; links are matched on raw bytes, so pages are never decoded
+LINK_RE = re.compile(rb'<a\s+(?:[^>]*?)href="([^"]*)"', re.ASCII | re.IGNORECASE)
+
 
 def main():
     if len(sys.argv) != 2:
@@ -35,10 +39,9 @@ def crawl(directory):
     for filename in os.listdir(directory):
         if not filename.endswith(".html"):
             continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+        with open(os.path.join(directory, filename), "rb") as f:
+            links = {link.decode() for link in LINK_RE.findall(f.read())}
+            pages[filename] = links - {filename}
 
     # Only include links to other pages in the corpus
     for filename in pages:
@@ -59,16 +62,17 @@ def transition_model(
     a link at random chosen from all pages in the corpus.
     """
     links = corpus[page]
-    total = len(corpus.keys())
+    total = len(corpus)
 
     if not len(links):
-        return {page: 1 / total for page in corpus.keys()}
+        return dict.fromkeys(corpus, 1 / total)
 
-    distrib = {}
-    for page in corpus:
-        random_jump = (1 - damping_factor) / total
-        link_jump = damping_factor / len(links) if page in links else 0
-        distrib[page] = random_jump + link_jump
+    # Every page gets the same random-jump share; only linked pages get
+    # the link share on top of it
+    distrib = dict.fromkeys(corpus, (1 - damping_factor) / total)
+    link_jump = damping_factor / len(links)
+    for link in links:
+        distrib[link] += link_jump
 
     return distrib
 
@@ -85,24 +89,32 @@ def sample_pagerank(
     PageRank values should sum to 1.
     """
     pages = list(corpus.keys())
-    counts = {p: 0 for p in pages}
-    current = random.choice(pages)
+    total = len(pages)
+    index = {page: i for i, page in enumerate(pages)}
+    links = [tuple(index[link] for link in corpus[page]) for page in pages]
 
-    for _ in range(n):
-        counts[current] += 1
-        tm = transition_model(corpus, current, damping_factor)
-        current = random.choices(
-            population=list(tm.keys()), weights=list(tm.values()), k=1
-        )[0]
+    # Draw all random numbers up front: `jumps` decides between following
+    # a link and a random jump, `picks` selects the page within that choice
+    rng = np.random.default_rng()
+    jumps = rng.random(n).tolist()
+    picks = rng.random(n).tolist()
 
-    return {page: counts[page] / n for page in counts}
+    counts = [0] * total
+    current = int(rng.integers(total))
 
+    for jump, pick in zip(jumps, picks):
+        counts[current] += 1
+        out = links[current]
 
-convergence_threshold = 0.001
+        if not out or jump >= damping_factor:
+            current = int(pick * total)
+        else:
+            current = out[int(pick * len(out))]
 
+    return {page: counts[i] / n for i, page in enumerate(pages)}
 
-def dangling(corpus: dict[str, set[str]], page: str):
-    return corpus[page] if len(corpus[page]) else corpus.keys()
+
+convergence_threshold = 0.001
 
 
 def iterate_pagerank(
@@ -117,29 +129,29 @@ def iterate_pagerank(
     PageRank values should sum to 1.
     """
     pages = list(corpus.keys())
-    ranks = {page: 1 / len(pages) for page in pages}
+    n = len(pages)
+    index = {page: i for i, page in enumerate(pages)}
+
+    # The link graph as a sparse column-stochastic matrix: one (source,
+    # target) entry per link, weighted by 1 / out-degree of the source
+    source = np.array([index[p] for p in pages for _ in corpus[p]], dtype=np.intp)
+    target = np.array([index[t] for p in pages for t in corpus[p]], dtype=np.intp)
+    outdeg = np.array([len(corpus[p]) for p in pages], dtype=np.float64)
+    weights = 1 / outdeg[source]
+
+    # A page without links is treated as linking to every page, itself
+    # included; its rank is spread evenly as `dangling_mass`
+    dangling = outdeg == 0
+
+    ranks = np.full(n, 1 / n)
 
     while True:
-        new_ranks = {}
-
-        for page in pages:
-            links = {p for p in corpus if page in dangling(corpus, p)}
-            new_ranks[page] = (1 - damping_factor) / len(pages) + damping_factor * sum(
-                map(
-                    lambda page: ranks[page] / len(dangling(corpus, page)),
-                    links,
-                )
-            )
-
-        converged = all(
-            [
-                abs(new_ranks[page] - ranks[page]) <= convergence_threshold
-                for page in pages
-            ]
-        )
-
-        if converged:
-            return new_ranks
+        dangling_mass = ranks[dangling].sum() / n
+        linked = np.bincount(target, weights=ranks[source] * weights, minlength=n)
+        new_ranks = (1 - damping_factor) / n + damping_factor * (linked + dangling_mass)
+
+        if np.max(np.abs(new_ranks - ranks)) <= convergence_threshold:
+            return {page: float(new_ranks[i]) for i, page in enumerate(pages)}
 
         ranks = new_ranks
 
@@ -1,6 +1,8 @@
+import heapq
 import sys
 from collections import deque
 from functools import wraps
+from itertools import count
 from time import time
 
 from crossword import Crossword, Variable
@@ -31,6 +33,47 @@ class CrosswordCreator:
             var: self.crossword.words.copy() for var in self.crossword.variables
         }
 
+        # Give every word a bit. The search runs on `_domain_mask`, each domain
+        # as an int mask over `self._words`, loaded from and stored back into
+        # `self.domains` by the public methods
+        self._words = tuple(sorted(self.crossword.words))
+        self._word_bits = {word: 1 << bit for bit, word in enumerate(self._words)}
+        self._domain_mask: dict[Variable, int] = {}
+
+        # Neighbors and overlaps never change, so look them up once
+        self._neighbors = {
+            var: frozenset(self.crossword.neighbors(var))
+            for var in self.crossword.variables
+        }
+        self._overlaps = dict(self.crossword.overlaps)
+        self._n_vars = len(self.crossword.variables)
+
+        # Arcs for AC-3: all of them, and those pointing into each variable
+        self._arcs_into = {
+            var: [(y, var) for y in self._neighbors[var]]
+            for var in self.crossword.variables
+        }
+        self._initial_arcs = [arc for arcs in self._arcs_into.values() for arc in arcs]
+
+        # `_letter_masks[k, c]` has the bits of all words with letter c at index k
+        letter_masks: dict[tuple[int, str], int] = {}
+        for word, bit in self._word_bits.items():
+            for k, letter in enumerate(word):
+                letter_masks[k, letter] = letter_masks.get((k, letter), 0) | bit
+        self._letter_masks = letter_masks
+        self._letters = sorted({letter for _, letter in letter_masks})
+
+        # (variable, previous mask) for every domain change, so it can be undone
+        self._trail: list[tuple[Variable, int]] = []
+
+        # Words used by the assignment backtrack is building, which must be unique
+        self._assigned_words: set[str] = set()
+
+        # Heap of (domain size, -degree, tiebreak, variable) for MRV, pushed on
+        # every domain change; entries whose size went stale are skipped lazily
+        self._var_heap: list[tuple[int, int, int, Variable]] = []
+        self._tiebreak = count()
+
     def letter_grid(self, assignment: Assignment):
         """
         Return 2D array representing a given assignment.
@@ -117,7 +160,7 @@ class CrosswordCreator:
     def correctly_overlaps(
         self, x: Variable, wordx: str, y: Variable, wordy: str
     ) -> bool | None:
-        overlap = self.crossword.overlaps[x, y]
+        overlap = self._overlaps[x, y]
 
         if overlap:
             i, j = overlap
@@ -125,6 +168,70 @@ class CrosswordCreator:
 
         return None
 
+    def _mask_of(self, words: set[str]) -> int:
+        """
+        Return `words` as a bit mask.
+        """
+        mask = 0
+        for word in words:
+            mask |= self._word_bits[word]
+        return mask
+
+    def _words_in(self, mask: int) -> list[str]:
+        """
+        Return the words whose bits are set in `mask`.
+        """
+        words = []
+        while mask:
+            low = mask & -mask
+            words.append(self._words[low.bit_length() - 1])
+            mask ^= low
+        return words
+
+    def _load_masks(self):
+        """
+        Start a search from `self.domains`: rebuild the domain masks, and clear
+        the trail and the MRV heap to match them.
+        """
+        self._domain_mask = {
+            var: self._mask_of(words) for var, words in self.domains.items()
+        }
+        self._trail = []
+        self._var_heap = []
+        for var in self._domain_mask:
+            self._push_variable(var)
+
+    def _store_masks(self):
+        """
+        Copy the domain masks back into `self.domains` as sets of words.
+        """
+        for var, mask in self._domain_mask.items():
+            self.domains[var] = set(self._words_in(mask))
+
+    def _push_variable(self, var: Variable):
+        """
+        Record the current domain size of `var` in the MRV heap.
+        """
+        heapq.heappush(
+            self._var_heap,
+            (
+                self._domain_mask[var].bit_count(),
+                -len(self._neighbors[var]),
+                next(self._tiebreak),
+                var,
+            ),
+        )
+
+    def _undo(self, mark: int):
+        """
+        Restore the domains changed since the trail was `mark` entries long.
+        """
+        trail = self._trail
+        while len(trail) > mark:
+            variable, mask = trail.pop()
+            self._domain_mask[variable] = mask
+            self._push_variable(variable)
+
     def enforce_node_consistency(self):
         """
         Update `self.domains` such that each variable is node-consistent.
@@ -145,19 +252,40 @@ class CrosswordCreator:
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
         """
-        revised = False
-
-        for wordx in set(self.domains[x]):
-            satisfies_constraint = any(
-                self.correctly_overlaps(x, wordx, y, wordy) for wordy in self.domains[y]
-            )
+        self._domain_mask[x] = self._mask_of(self.domains[x])
+        self._domain_mask[y] = self._mask_of(self.domains[y])
 
-            if not satisfies_constraint:
-                self.domains[x].remove(wordx)
-                revised = True
+        revised = self._revise(x, y)
+        if revised:
+            self.domains[x] = set(self._words_in(self._domain_mask[x]))
 
         return revised
 
+    def _revise(self, x: Variable, y: Variable) -> bool:
+        """
+        `revise` on the domain masks, recording the change on the trail.
+        """
+        overlap = self._overlaps.get((x, y))
+        if overlap is None:
+            return False
+
+        # Keep the words of x whose letter at i is found at j in some word of y
+        i, j = overlap
+        domain_y = self._domain_mask[y]
+        keep = 0
+        for letter in self._letters:
+            if domain_y & self._letter_masks.get((j, letter), 0):
+                keep |= self._letter_masks.get((i, letter), 0)
+
+        domain_x = self._domain_mask[x]
+        if domain_x & keep == domain_x:
+            return False
+
+        self._trail.append((x, domain_x))
+        self._domain_mask[x] = domain_x & keep
+        self._push_variable(x)
+        return True
+
     def ac3(self, arcs: deque[tuple[Variable, Variable]] | None = None) -> bool:
         """
         Update `self.domains` such that each variable is arc consistent.
@@ -167,22 +295,32 @@ class CrosswordCreator:
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
         """
-        queue = deque(
-            arcs
-            if arcs is not None
-            else [
-                (x, y) for x in self.domains.keys() for y in self.crossword.neighbors(x)
-            ]
-        )
+        self._load_masks()
+        consistent = self._ac3(arcs)
+        self._store_masks()
+
+        return consistent
+
+    def _ac3(self, arcs: deque[tuple[Variable, Variable]] | None = None) -> bool:
+        """
+        `ac3` on the domain masks.
+        """
+        queue = deque(arcs if arcs is not None else self._initial_arcs)
+        # Arcs waiting in the queue, so none is queued twice
+        in_queue = set(queue)
 
         while len(queue) != 0:
-            (x, y) = queue.popleft()
-            if self.revise(x, y):
-                if len(self.domains[x]) == 0:
+            arc = queue.popleft()
+            in_queue.discard(arc)
+            x, y = arc
+            if self._revise(x, y):
+                if not self._domain_mask[x]:
                     return False
 
-                for z in self.crossword.neighbors(x) - set([y]):
-                    queue.append((z, x))
+                for arc in self._arcs_into[x]:
+                    if arc[0] != y and arc not in in_queue:
+                        queue.append(arc)
+                        in_queue.add(arc)
 
         return True
 
@@ -191,11 +329,8 @@ class CrosswordCreator:
         Return True if `assignment` is complete (i.e., assigns a value to each
         crossword variable); return False otherwise.
         """
-        for variable in self.crossword.variables:
-            if variable not in assignment or not assignment[variable]:
-                return False
-
-        return True
+        # Only crossword variables are ever assigned, and always to a word
+        return len(assignment) == self._n_vars
 
     def consistent(self, assignment: Assignment) -> bool:
         """
@@ -210,13 +345,30 @@ class CrosswordCreator:
             if len(word) != variable.length:
                 return False
 
-            for neighbor in self.crossword.neighbors(variable):
+            for neighbor in self._neighbors[variable]:
                 val = assignment.get(neighbor)
                 if val and not self.correctly_overlaps(variable, word, neighbor, val):
                     return False
 
         return True
 
+    def _consistent_with(
+        self, variable: Variable, value: str, assignment: Assignment
+    ) -> bool:
+        """
+        Return True if assigning `value` to `variable` keeps the consistent
+        `assignment` consistent; only the constraints on `variable` are checked.
+        """
+        if len(value) != variable.length or value in self._assigned_words:
+            return False
+
+        for neighbor in self._neighbors[variable]:
+            word = assignment.get(neighbor)
+            if word and not self.correctly_overlaps(variable, value, neighbor, word):
+                return False
+
+        return True
+
     def order_domain_values1(self, var: Variable, assignment: Assignment) -> list[str]:
         """
         Return a list of values in the domain of `var`, in order by
@@ -233,35 +385,24 @@ class CrosswordCreator:
         The first value in the list, for example, should be the one
         that rules out the fewest values among the neighbors of `var`.
         """
-        words = (
-            self.domains[var]
-            if var not in assignment
-            else self.domains[var] - set(assignment[var])
-        )
+        self._load_masks()
+        return self._order_domain_values(var, assignment)
 
-        conflicts = {}
-        neighbors = (n for n in self.crossword.neighbors(var) if n not in assignment)
+    def _order_domain_values(self, var: Variable, assignment: Assignment) -> list[str]:
+        """
+        `order_domain_values` on the domain masks.
+        """
+        neighbors = [n for n in self._neighbors[var] if n not in assignment]
 
-        for w in words:
+        def ruled_out(word: str) -> int:
             count = 0
-
             for n in neighbors:
-                count += sum(
-                    [
-                        1
-                        for y in self.domains[n]
-                        if (correct := self.correctly_overlaps(var, w, n, y))
-                        is not None
-                        and not correct
-                    ]
-                )
-
-            conflicts[w] = count
-
-        return sorted(
-            words,
-            key=lambda word: -conflicts[word],
-        )
+                i, j = self._overlaps[var, n]
+                fits = self._letter_masks.get((j, word[i]), 0)
+                count += (self._domain_mask[n] & ~fits).bit_count()
+            return count
+
+        return sorted(self._words_in(self._domain_mask[var]), key=ruled_out)
 
     def select_unassigned_variable1(self, assignment: Assignment) -> Variable:
         for variable in self.crossword.variables:
@@ -278,14 +419,21 @@ class CrosswordCreator:
         degree. If there is a tie, any of the tied variables are acceptable
         return values.
         """
-        unassigned = (
-            pair for pair in self.domains.items() if pair[0] not in assignment
-        )
+        self._load_masks()
+        return self._select_unassigned_variable(assignment)
+
+    def _select_unassigned_variable(self, assignment: Assignment) -> Variable:
+        """
+        `select_unassigned_variable` from the MRV heap.
+        """
+        heap = self._var_heap
+        while heap:
+            size, _, _, var = heap[0]
+            if var not in assignment and self._domain_mask[var].bit_count() == size:
+                return var
+            heapq.heappop(heap)
 
-        return min(
-            unassigned,
-            key=lambda pair: (len(pair[1]), -len(self.crossword.neighbors(pair[0]))),
-        )[0]
+        raise ValueError("no unassigned variable left")
 
     def backtrack(self, assignment: Assignment) -> Assignment | None:
         """
@@ -296,36 +444,53 @@ class CrosswordCreator:
 
         If no assignment is possible, return None.
         """
+        self._load_masks()
+        self._assigned_words = set(assignment.values())
+        result = self._backtrack(assignment)
+        self._store_masks()
 
+        return result
+
+    def _backtrack(self, assignment: Assignment) -> Assignment | None:
+        """
+        `backtrack` on the domain masks.
+        """
         if self.assignment_complete(assignment):
             return assignment
 
-        variable = self.select_unassigned_variable(assignment)
+        variable = self._select_unassigned_variable(assignment)
 
-        for value in self.order_domain_values(variable, assignment):
-            test_consistency = assignment.copy()
-            test_consistency[variable] = value
-            if self.consistent(test_consistency):
+        for value in self._order_domain_values(variable, assignment):
+            if self._consistent_with(variable, value, assignment):
+                # AC-3 prunes domains in place, so note where to roll back to
+                mark = len(self._trail)
                 assignment[variable] = value
-                inferred = self.ac3(
-                    deque([(y, variable) for y in self.crossword.neighbors(variable)])
-                )
-                inferences = [
-                    x for x in self.domains.keys() if len(self.domains[x]) == 1
-                ]
-
-                if inferred and len(inferences):
-                    for x in inferences:
-                        assignment[x] = list(self.domains[x])[0]
-
-                result = self.backtrack(assignment)
-                if result:
-                    return result
-
-                del assignment[variable]
-
-                for x in inferences:
-                    del assignment[x]
+                self._assigned_words.add(value)
+                self._trail.append((variable, self._domain_mask[variable]))
+                self._domain_mask[variable] = self._word_bits[value]
+                inferences = []
+
+                if self._ac3(deque(self._arcs_into[variable])):
+                    for x, mask in self._domain_mask.items():
+                        if mask.bit_count() != 1 or x in assignment:
+                            continue
+
+                        word = self._words[mask.bit_length() - 1]
+                        if not self._consistent_with(x, word, assignment):
+                            break
+
+                        assignment[x] = word
+                        self._assigned_words.add(word)
+                        inferences.append(x)
+                    else:
+                        result = self._backtrack(assignment)
+                        if result:
+                            return result
+
+                for x in [variable, *inferences]:
+                    self._assigned_words.discard(assignment.pop(x))
+                    self._push_variable(x)
+                self._undo(mark)
 
         return None
 
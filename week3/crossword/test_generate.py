@@ -0,0 +1,81 @@
+import os
+
+import pytest
+from crossword import Crossword
+from generate import CrosswordCreator
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+def creator(structure, words):
+    return CrosswordCreator(
+        Crossword(
+            os.path.join(DATA, f"structure{structure}.txt"),
+            os.path.join(DATA, f"words{words}.txt"),
+        )
+    )
+
+
+def overlapping_pair(crossword):
+    for (x, y), overlap in crossword.overlaps.items():
+        if overlap is not None:
+            return x, y, overlap
+
+
+def test_enforce_node_consistency_keeps_word_sets():
+    c = creator(1, 1)
+    c.enforce_node_consistency()
+
+    for variable, domain in c.domains.items():
+        assert isinstance(domain, set)
+        assert domain
+        assert all(len(word) == variable.length for word in domain)
+
+
+def test_revise_on_word_sets():
+    c = creator(1, 1)
+    c.enforce_node_consistency()
+    x, y, (i, j) = overlapping_pair(c.crossword)
+
+    wordy = next(iter(c.domains[y]))
+    c.domains[y] = {wordy}
+    before = set(c.domains[x])
+
+    revised = c.revise(x, y)
+    assert isinstance(c.domains[x], set)
+    assert c.domains[x] == {word for word in before if word[i] == wordy[j]}
+    assert revised == (c.domains[x] != before)
+
+
+def test_ac3_on_word_sets():
+    c = creator(1, 2)
+    c.enforce_node_consistency()
+    assert c.ac3()
+
+    for (x, y), overlap in c.crossword.overlaps.items():
+        if overlap is None:
+            continue
+        i, j = overlap
+        letters = {word[j] for word in c.domains[y]}
+        assert isinstance(c.domains[x], set)
+        assert all(word[i] in letters for word in c.domains[x])
+
+
+@pytest.mark.parametrize("words", [1, 2])
+def test_solve_structure1(words):
+    c = creator(1, words)
+    assignment = c.solve()
+
+    assert assignment is not None
+    assert set(assignment) == c.crossword.variables
+    assert len(set(assignment.values())) == len(assignment)
+    for variable, word in assignment.items():
+        assert word in c.crossword.words
+        assert len(word) == variable.length
+        for neighbor in c.crossword.neighbors(variable):
+            i, j = c.crossword.overlaps[variable, neighbor]
+            assert word[i] == assignment[neighbor][j]
+
+
+def test_solve_no_solution():
+    assert creator(1, 0).solve() is None
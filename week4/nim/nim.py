@@ -2,6 +2,7 @@ import functools
 import math
 import random
 import time
+from operator import itemgetter, xor
 
 
 def log_function_call(func):
@@ -21,6 +22,11 @@ def log_function_call(func):
     return wrapper
 
 
+@functools.lru_cache(maxsize=None)
+def _actions_for(piles: tuple[int, ...]) -> tuple[tuple[int, int], ...]:
+    return tuple((i, j) for i, pile in enumerate(piles) for j in range(1, pile + 1))
+
+
 class Nim:
     def __init__(self, initial=[1, 3, 5, 7]):
         """
@@ -30,10 +36,20 @@ class Nim:
             - `player`: 0 or 1 to indicate which player's turn
             - `winner`: None, 0, or 1 to indicate who the winner is
         """
+        self._initial = tuple(initial)
         self.piles = initial.copy()
         self.player = 0
         self.winner = None
 
+    def reset(self):
+        """
+        Start a new game on the same board, refilling the piles in place
+        with the ones it was created with.
+        """
+        self.piles[:] = self._initial
+        self.player = 0
+        self.winner = None
+
     @classmethod
     def available_actions(cls, piles):
         """
@@ -43,11 +59,7 @@ class Nim:
         Action `(i, j)` represents the action of removing `j` items
         from pile `i` (where piles are 0-indexed).
         """
-        actions = set()
-        for i, pile in enumerate(piles):
-            for j in range(1, pile + 1):
-                actions.add((i, j))
-        return actions
+        return _actions_for(tuple(piles))
 
     @classmethod
     def other_player(cls, player):
@@ -83,7 +95,7 @@ class Nim:
         self.switch_player()
 
         # Check for a winner
-        if all(pile == 0 for pile in self.piles):
+        if not any(self.piles):
             self.winner = self.player
 
 
@@ -92,18 +104,44 @@ type ListState = list[int]
 type Action = tuple[int, int]
 
 
+def optimal_action(piles: ListState) -> Action:
+    """
+    Return a winning action `(i, j)` for `piles` if there is one, found
+    from the nim-sum rather than by training.
+
+    The player who takes the last object loses (misère Nim): play as in
+    normal Nim, leaving a nim-sum of 0, until the move would leave no pile
+    larger than 1; then leave an odd number of piles of size 1 instead.
+    Without a winning action, take 1 from the largest pile.
+    """
+    large = [i for i, pile in enumerate(piles) if pile > 1]
+
+    if len(large) == 1:
+        i = large[0]
+        ones = sum(1 for pile in piles if pile == 1)
+        return (i, piles[i] if ones % 2 else piles[i] - 1)
+
+    if large:
+        nim_sum = functools.reduce(xor, piles, 0)
+        for i, pile in enumerate(piles):
+            if pile ^ nim_sum < pile:
+                return (i, pile - (pile ^ nim_sum))
+
+    return (max(range(len(piles)), key=piles.__getitem__), 1)
+
+
 class NimAI:
     def __init__(self, alpha=0.5, epsilon=0.1):
         """
         Initialize AI with an empty Q-learning dictionary,
         an alpha (learning) rate, and an epsilon rate.
 
-        The Q-learning dictionary maps `(state, action)`
-        pairs to a Q-value (a number).
+        The Q-learning dictionary maps each `state` to a dictionary
+        from `action` to a Q-value (a number).
          - `state` is a tuple of remaining piles, e.g. (1, 1, 4, 4)
          - `action` is a tuple `(i, j)` for an action
         """
-        self.q: dict[tuple[State, Action], float] = dict()
+        self.q: dict[State, dict[Action, float]] = dict()
         self.alpha = alpha
         self.epsilon = epsilon
 
@@ -125,20 +163,17 @@ class NimAI:
 
         self.update_q_value(old_state, action, old, reward, best_future)
 
-    @log_function_call
-    def get_q_value(self, state: ListState, action: Action):
+    def get_q_value(self, state: ListState | State, action: Action):
         """
         Return the Q-value for the state `state` and the action `action`.
         If no Q-value exists yet in `self.q`, return 0.
         """
-        q = self.q.get((tuple(state), action))
-
-        return q if q is not None else 0
+        # tuple() hands a State back as is, so callers may pass either form
+        return self.q.get(tuple(state), {}).get(action, 0)
 
-    @log_function_call
     def update_q_value(
         self,
-        state: ListState,
+        state: ListState | State,
         action: Action,
         old_q: int,
         reward: int,
@@ -163,10 +198,9 @@ class NimAI:
         #     print(f"update_q_value value: {val}")
         #     print(f"self.q: {self.q}\n")
 
-        self.q[(tuple(state), action)] = val
+        self.q.setdefault(tuple(state), {})[action] = val
 
-    @log_function_call
-    def best_future_reward(self, state: ListState) -> float:
+    def best_future_reward(self, state: ListState | State) -> float:
         """
         Given a state `state`, consider all possible `(state, action)`
         pairs available in that state and return the maximum of all
@@ -181,31 +215,27 @@ class NimAI:
         if not len(actions):
             return 0
 
-        best = -math.inf
-        for action in actions:
-            q = self.q.get((tuple(state), action)) or 0
-
-            if q > best:
-                best = q
+        values = self.q.get(tuple(state), {})
+        best = max(values.values(), default=-math.inf)
 
-        return best
+        # Actions without a Q-value count as 0
+        return max(best, 0) if len(values) < len(actions) else best
 
-    @log_function_call
-    def best_action(self, state: ListState) -> Action | None:
+    def best_action(self, state: ListState | State) -> Action | None:
         actions = Nim.available_actions(state)
 
-        best = -math.inf
-        best_action = None
-        for action in actions:
-            q = self.q.get((tuple(state), action)) or 0
-            if q > best:
-                best = q
-                best_action = action
+        values = self.q.get(tuple(state), {})
+        best_action, best = max(
+            values.items(), key=itemgetter(1), default=(None, -math.inf)
+        )
+
+        # Actions without a Q-value count as 0
+        if best < 0 and len(values) < len(actions):
+            return next(action for action in actions if action not in values)
 
         return best_action
 
-    @log_function_call
-    def choose_action(self, state: ListState, epsilon=True) -> tuple[int, int]:
+    def choose_action(self, state: ListState | State, epsilon=True) -> tuple[int, int]:
         """
         Given a state `state`, return an action `(i, j)` to take.
 
@@ -221,12 +251,12 @@ class NimAI:
         options is an acceptable return value.
         """
         actions = Nim.available_actions(state)
-        best_action = self.best_action(state) or list(actions)[0]
+        best_action = self.best_action(state) or actions[0]
 
         if epsilon:
             prob = 1 - self.epsilon
             if random.random() > prob:
-                return tuple(random.choice(list(actions)))
+                return random.choice(actions)
 
         return best_action
 
@@ -238,19 +268,21 @@ def train(n):
 
     player = NimAI()
 
-    # Play n games
+    # Play n games, reusing one board
+    game = Nim()
     for i in range(n):
         print(f"Playing training game {i + 1}")
-        game = Nim()
+        game.reset()
 
         # Keep track of last move made by either player
         last = {0: {"state": None, "action": None}, 1: {"state": None, "action": None}}
 
         # Game loop
         while True:
-            # Keep track of current state and action
-            state = game.piles.copy()
-            action = player.choose_action(game.piles)
+            # Keep track of current state and action, as tuples that NimAI
+            # uses directly as Q-table keys
+            state = tuple(game.piles)
+            action = player.choose_action(state)
 
             # Keep track of last state and action
             last[game.player]["state"] = state
@@ -258,7 +290,7 @@ def train(n):
 
             # Make move
             game.move(action)
-            new_state = game.piles.copy()
+            new_state = tuple(game.piles)
 
             # When game is over, update Q values with rewards
             if game.winner is not None:
@@ -286,9 +318,10 @@ def train(n):
     return player
 
 
-def play(ai, human_player=None):
+def play(ai=None, human_player=None):
     """
     Play human game against the AI.
+    `ai` is a trained `NimAI`; if None, the AI plays `optimal_action`.
     `human_player` can be set to 0 or 1 to specify whether
     human player moves first or second.
     """
@@ -326,7 +359,11 @@ def play(ai, human_player=None):
         # Have AI make a move
         else:
             print("AI's Turn")
-            pile, count = ai.choose_action(game.piles, epsilon=False)
+            pile, count = (
+                ai.choose_action(game.piles, epsilon=False)
+                if ai is not None
+                else optimal_action(game.piles)
+            )
             print(f"AI chose to take {count} from pile {pile}.")
 
         # Make move
@@ -1,4 +1,4 @@
-from nim import play, train
+from nim import play
 
-ai = train(10000)
-play(ai)
+# Nim has a closed-form optimal policy, so the AI needs no training
+play()
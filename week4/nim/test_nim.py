@@ -0,0 +1,72 @@
+from functools import lru_cache
+from itertools import product
+
+import pytest
+from nim import Nim, optimal_action
+
+
+@lru_cache(maxsize=None)
+def mover_wins(piles):
+    """
+    Brute-force search: True if the player to move wins from `piles` when
+    taking the last object loses.
+    """
+    if not any(piles):
+        # The opponent took the last object
+        return True
+
+    for i, j in Nim.available_actions(piles):
+        after = list(piles)
+        after[i] -= j
+        if not mover_wins(tuple(after)):
+            return True
+
+    return False
+
+
+def positions(*sizes):
+    return [
+        list(piles) for piles in product(*(range(n + 1) for n in sizes)) if any(piles)
+    ]
+
+
+def assert_optimal(piles):
+    i, j = optimal_action(piles)
+    assert 0 <= i < len(piles) and 1 <= j <= piles[i]
+
+    if mover_wins(tuple(piles)):
+        after = piles.copy()
+        after[i] -= j
+        assert not mover_wins(tuple(after)), (piles, (i, j))
+
+
+def test_optimal_action_every_position_from_default_board():
+    for piles in positions(1, 3, 5, 7):
+        assert_optimal(piles)
+
+
+def test_optimal_action_other_layouts():
+    for piles in positions(4, 4, 2) + positions(2, 2, 2, 2, 2):
+        assert_optimal(piles)
+
+
+@pytest.mark.parametrize(
+    "piles",
+    [
+        [1, 0, 0, 0],
+        [1, 1, 0, 0],
+        [1, 1, 1, 0],
+        [1, 1, 1, 1],
+        [0, 0, 0, 6],
+        [1, 0, 0, 6],
+        [1, 1, 0, 6],
+    ],
+)
+def test_optimal_action_endgames(piles):
+    assert_optimal(piles)
+
+
+def test_optimal_action_losing_position_is_legal():
+    piles = [1, 2, 3, 0]
+    assert not mover_wins(tuple(piles))
+    assert_optimal(piles)
@@ -93,33 +93,30 @@ def load_data(filename: str) -> tuple[np.ndarray, np.ndarray]:
     df = pd.read_csv(
         filename,
         dtype={
-            "Administrative": np.int32,
-            "Administrative_Duration": np.float64,
-            "Informational": np.int32,
-            "Informational_Duration": np.float64,
-            "ProductRelated": np.int32,
-            "ProductRelated_Duration": np.float64,
-            "BounceRates": np.float64,
-            "ExitRates": np.float64,
-            "PageValues": np.float64,
-            "SpecialDay": np.float64,
-            "OperatingSystems": np.int32,
-            "Browser": np.int32,
-            "Region": np.int32,
-            "TrafficType": np.int32,
+            "Administrative": np.int16,
+            "Administrative_Duration": np.float32,
+            "Informational": np.int16,
+            "Informational_Duration": np.float32,
+            "ProductRelated": np.int16,
+            "ProductRelated_Duration": np.float32,
+            "BounceRates": np.float32,
+            "ExitRates": np.float32,
+            "PageValues": np.float32,
+            "SpecialDay": np.float32,
+            "OperatingSystems": np.int8,
+            "Browser": np.int8,
+            "Region": np.int8,
+            "TrafficType": np.int8,
         },
     )
-    df["Month"] = df["Month"].map(lambda r: MONTHS[r])
-    df["VisitorType"] = (
-        df["VisitorType"]
-        .map(lambda r: 1 if r == "Returning_Visitor" else 0)
-        .astype(np.int32)
-    )
-    df["Weekend"] = df["Weekend"].astype(np.int32)
-    df["Revenue"] = df["Revenue"].astype(np.int32)
+    df["Month"] = df["Month"].map(MONTHS).astype(np.int8)
+    df["VisitorType"] = (df["VisitorType"] == "Returning_Visitor").astype(np.int8)
+    df["Weekend"] = df["Weekend"].astype(np.int8)
+    df["Revenue"] = df["Revenue"].astype(np.int8)
 
+    # float32 halves the data KNN has to move through its distance computations
     label = "Revenue"
-    evidence = df.drop(columns=label).to_numpy()
+    evidence = df.drop(columns=label).to_numpy(dtype=np.float32)
     labels = df[label].to_numpy()
 
     return (evidence, labels)
@@ -131,9 +128,13 @@ def train_model(evidence: np.ndarray, labels: np.ndarray) -> KNeighborsClassifie
     fitted k-nearest neighbor model (k=1) trained on the data.
     """
     print("Learning...")
-    model = KNeighborsClassifier(n_neighbors=1)
+    # A ball tree built at fit time answers each query without a full scan;
+    # predictions are spread over all cores
+    model = KNeighborsClassifier(
+        n_neighbors=1, algorithm="ball_tree", leaf_size=40, n_jobs=-1
+    )
 
-    model.fit(evidence, labels)
+    model.fit(np.asarray(evidence, dtype=np.float32), labels)
 
     return model
 
@@ -153,14 +154,14 @@ def evaluate(labels: np.ndarray, predictions: np.ndarray) -> tuple[float, float]
     representing the "true negative rate": the proportion of
     actual negative labels that were accurately identified.
     """
-    labels = np.array(labels)
-    predictions = np.array(predictions)
+    labels = np.asarray(labels, dtype=np.intp)
+    predictions = np.asarray(predictions, dtype=np.intp)
 
-    tp = np.sum((labels == 1) & (predictions == 1))
-    tn = np.sum((labels == 0) & (predictions == 0))
+    # Confusion matrix in one pass, indexed by 2 * label + prediction
+    tn, fp, fn, tp = np.bincount(2 * labels + predictions, minlength=4)
 
-    p = np.sum(labels == 1)
-    n = np.sum(labels == 0)
+    p = tp + fn
+    n = tn + fp
 
     sensitivity = tp / p if p != 0 else 0.0
     specificity = tn / n if n != 0 else 0.0
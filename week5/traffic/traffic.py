@@ -1,5 +1,6 @@
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2
 import numpy as np
@@ -11,6 +12,7 @@ IMG_WIDTH = 30
 IMG_HEIGHT = 30
 NUM_CATEGORIES = 43
 TEST_SIZE = 0.4
+BATCH_SIZE = 64
 
 
 def main():
@@ -18,6 +20,9 @@ def main():
     if len(sys.argv) not in [2, 3]:
         sys.exit("Usage: python traffic.py data_directory [model.h5]")
 
+    # Compute in float16 with float32 weights; see the output layer in get_model
+    tf.keras.mixed_precision.set_global_policy("mixed_float16")
+
     # Get image arrays and labels for all image files
     res = load_data(sys.argv[1])
     if res is None:
@@ -45,16 +50,19 @@ def main():
         tf.keras.callbacks.ModelCheckpoint("model.keras", save_best_only=True),
     ]
 
+    train_ds = make_dataset(x_train, y_train, shuffle=True)
+    test_ds = make_dataset(x_test, y_test)
+
     # Fit model on training data
     try:
-        model.fit(x_train, y_train, epochs=EPOCHS, callbacks=callbacks)
+        model.fit(train_ds, epochs=EPOCHS, callbacks=callbacks)
     except KeyboardInterrupt:
         print("Interrupt")
         exit(0)
 
     # Evaluate neural network performance
-    model.evaluate(x_train, y_train, verbose=2)
-    model.evaluate(x_test, y_test, verbose=2)
+    model.evaluate(make_dataset(x_train, y_train), verbose=2)
+    model.evaluate(test_ds, verbose=2)
 
     # Save model to file
     if len(sys.argv) == 3:
@@ -76,9 +84,11 @@ def load_data(data_dir: str) -> tuple[np.ndarray, np.ndarray] | None:
     numpy ndarray with dimensions IMG_WIDTH x IMG_HEIGHT x 3. `labels` should
     be a list of integer labels, representing the categories for each of the
     corresponding `images`.
+
+    Pixels are left as uint8; `make_dataset` scales them to [0, 1].
     """
     print("Loading data...")
-    images, labels = [], []
+    files = []
 
     for category in range(NUM_CATEGORIES):
         dir = os.path.join(data_dir, str(category))
@@ -95,25 +105,69 @@ def load_data(data_dir: str) -> tuple[np.ndarray, np.ndarray] | None:
             if not os.path.isfile(path):
                 return None
 
-            try:
-                img = cv2.imread(path)
-                rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                resized = cv2.resize(rgb, (IMG_WIDTH, IMG_HEIGHT))
-                assert resized.shape == (30, 30, 3)
+            files.append((path, category))
+
+    # Write every image straight into one array instead of stacking a list
+    images = np.empty((len(files), IMG_HEIGHT, IMG_WIDTH, 3), dtype=np.uint8)
+    labels = np.array([category for _, category in files], dtype=np.int32)
+    loaded = np.zeros(len(files), dtype=np.bool_)
 
-                images.append(resized)
-                labels.append(category)
-            except Exception as e:
-                print(f"Could not read {name}: {e}")
+    def load(index: int):
+        image = read_image(files[index][0])
+        if image is not None:
+            images[index] = image
+            loaded[index] = True
 
-    assert len(images) == len(labels)
+    # OpenCV releases the GIL while reading and resizing, so threads overlap
+    # disk access with decoding
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(load, range(len(files))))
 
-    images = np.array(images, dtype=np.float32) / 255.0
-    labels = np.array(labels, dtype=np.int32)
+    if not loaded.all():
+        images, labels = images[loaded], labels[loaded]
 
     return images, labels
 
 
+def read_image(path: str) -> np.ndarray | None:
+    """
+    Read the image at `path` as an RGB array of IMG_HEIGHT x IMG_WIDTH x 3,
+    or return None if it cannot be read.
+    """
+    try:
+        img = cv2.imread(path)
+        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        resized = cv2.resize(rgb, (IMG_WIDTH, IMG_HEIGHT))
+        assert resized.shape == (30, 30, 3)
+
+        return resized
+    except Exception as e:
+        print(f"Could not read {os.path.basename(path)}: {e}")
+        return None
+
+
+def make_dataset(
+    images: np.ndarray, labels: np.ndarray, shuffle: bool = False
+) -> tf.data.Dataset:
+    """
+    Return a batched input pipeline over `images` and `labels`. Pixels are
+    scaled to [0, 1] per batch in the pipeline, and batches are prefetched
+    while the model trains on the previous one.
+    """
+    dataset = tf.data.Dataset.from_tensor_slices((images, labels)).cache()
+    if shuffle:
+        dataset = dataset.shuffle(4096)
+
+    return (
+        dataset.batch(BATCH_SIZE)
+        .map(
+            lambda x, y: (tf.cast(x, tf.float32) / 255.0, y),
+            num_parallel_calls=tf.data.AUTOTUNE,
+        )
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+
 def get_model():
     """
     Returns a compiled convolutional neural network model. Assume that the
@@ -139,7 +193,10 @@ def get_model():
             tf.keras.layers.Dense(256, activation="relu"),
             tf.keras.layers.BatchNormalization(),
             tf.keras.layers.Dropout(0.5),
-            tf.keras.layers.Dense(NUM_CATEGORIES, activation="softmax"),
+            # Keep the softmax in float32 so it stays numerically stable
+            tf.keras.layers.Dense(
+                NUM_CATEGORIES, activation="softmax", dtype="float32"
+            ),
         ]
     )
     model.summary()
@@ -147,6 +204,8 @@ def get_model():
         optimizer="adam",
         loss="categorical_crossentropy",
         metrics=["accuracy"],
+        # Let XLA fuse the conv, bias, activation and pooling kernels
+        jit_compile=True,
     )
 
     return model
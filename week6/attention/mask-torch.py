@@ -1,4 +1,7 @@
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 
 import numpy as np
 import torch
@@ -21,15 +24,15 @@ def main():
     text = input("Text: ")
 
     # Tokenize input
-    tokenizer = AutoTokenizer.from_pretrained(MODEL)
+    tokenizer, model = load_model()
     inputs = tokenizer(text, return_tensors="pt")
     mask_token_index = get_mask_token_index(tokenizer.mask_token_id, inputs)
     if mask_token_index is None:
         sys.exit(f"Input must include mask token {tokenizer.mask_token}.")
 
-    # Use model to process input
-    model = BertForMaskedLM.from_pretrained(MODEL)
-    result = model(**inputs, output_attentions=True)
+    # Use model to process input, without tracking gradients
+    with torch.inference_mode():
+        result = model(**inputs, output_attentions=True)
 
     # Generate predictions
     mask_token_logits = result.logits[0, mask_token_index]
@@ -41,30 +44,29 @@ def main():
     visualize_attentions(inputs.tokens(), result.attentions)
 
 
+@lru_cache(maxsize=1)
+def load_model() -> tuple[AutoTokenizer, BertForMaskedLM]:
+    """
+    Load the tokenizer and masked language model for MODEL once, so later
+    calls in the same process reuse them.
+    """
+    tokenizer = AutoTokenizer.from_pretrained(MODEL)
+    model = BertForMaskedLM.from_pretrained(MODEL).eval()
+    return tokenizer, model
+
+
 def get_mask_token_index(mask_token_id: int, inputs: BatchEncoding) -> int | None:
     """
     Return the index of the token with the specified `mask_token_id`, or
     `None` if not present in the `inputs`.
     """
-    ids = inputs["input_ids"]
-
-    found = np.where(ids == mask_token_id)[1].item()
-    if found:
-        return found
+    matches = (inputs["input_ids"][0] == mask_token_id).nonzero()
+    if matches.numel():
+        return int(matches[0])
 
     return None
 
 
-def get_color_for_attention_score(attention_score: torch.Tensor):
-    """
-    Return a tuple of three integers representing a shade of gray for the
-    given `attention_score`. Each value should be in the range [0, 255].
-    """
-    score = attention_score.item()
-    color = round(255 * score)
-    return (color, color, color)
-
-
 def visualize_attentions(tokens: list[str], attentions: torch.Tensor):
     """
     Produce a graphical representation of self-attention scores.
@@ -85,26 +87,34 @@ def visualize_attentions(tokens: list[str], attentions: torch.Tensor):
     j - beam number index
     k - index of head in the layer
     """
+    layer_numbers, head_numbers, weights = [], [], []
     for i in range(len(attentions)):
         j = 0
-        for k in range(len(attentions[i][j])):
-            generate_diagram(i + 1, k + 1, tokens, attentions[i][j][k])
+        # Copy each layer out of torch once instead of reading scores one by one
+        heads = attentions[i][j].cpu().numpy()
+        for k in range(len(heads)):
+            layer_numbers.append(i + 1)
+            head_numbers.append(k + 1)
+            weights.append(heads[k])
+
+    # Diagrams are independent and CPU-bound, so draw them in parallel
+    with ProcessPoolExecutor() as executor:
+        list(
+            executor.map(
+                generate_diagram,
+                layer_numbers,
+                head_numbers,
+                repeat(tokens),
+                weights,
+            )
+        )
 
 
-def generate_diagram(
-    layer_number: int,
-    head_number: int,
-    tokens: list[str],
-    attention_weights: torch.Tensor,
-):
+@lru_cache(maxsize=1)
+def labels_layer(tokens: tuple[str, ...]) -> Image.Image:
     """
-    Generate a diagram representing the self-attention scores for a single
-    attention head. The diagram shows one row and column for each of the
-    `tokens`, and cells are shaded based on `attention_weights`, with lighter
-    cells corresponding to higher attention scores.
-
-    The diagram is saved with a filename that includes both the `layer_number`
-    and `head_number`.
+    Return a blank diagram for `tokens` with the token labels drawn along
+    its rows and columns.
     """
     # Create new image
     image_size = GRID_SIZE * len(tokens) + PIXELS_PER_WORD
@@ -134,13 +144,33 @@ def generate_diagram(
             font=FONT,
         )
 
-    # Draw each word
-    for i in range(len(tokens)):
-        y = PIXELS_PER_WORD + i * GRID_SIZE
-        for j in range(len(tokens)):
-            x = PIXELS_PER_WORD + j * GRID_SIZE
-            color = get_color_for_attention_score(attention_weights[i][j])
-            draw.rectangle((x, y, x + GRID_SIZE, y + GRID_SIZE), fill=color)
+    return img
+
+
+def generate_diagram(
+    layer_number: int,
+    head_number: int,
+    tokens: list[str],
+    attention_weights: np.ndarray,
+):
+    """
+    Generate a diagram representing the self-attention scores for a single
+    attention head. The diagram shows one row and column for each of the
+    `tokens`, and cells are shaded based on `attention_weights`, with lighter
+    cells corresponding to higher attention scores.
+
+    The diagram is saved with a filename that includes both the `layer_number`
+    and `head_number`.
+    """
+    # Start from the token labels, which are the same for every diagram
+    img = labels_layer(tuple(tokens)).copy()
+
+    # Shade each word pair: scale scores to gray levels, blow every score up
+    # into a GRID_SIZE square and paste the whole grid at once
+    shades = (attention_weights * 255).round().astype(np.uint8)
+    grid = np.kron(shades, np.ones((GRID_SIZE, GRID_SIZE), dtype=np.uint8))
+    heatmap = Image.fromarray(grid).convert("RGBA")
+    img.paste(heatmap, (PIXELS_PER_WORD, PIXELS_PER_WORD))
 
     # Save image
     img.save(f"Attention_Layer{layer_number}_Head{head_number}.png")